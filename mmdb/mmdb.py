@@ -44,9 +44,13 @@ class MMDB(object):
         self.tree = tree
         self.meta = meta.clone()
 
-    def write(self, fname):
+    def write(self, dest):
         writer = Writer(self.tree, self.meta)
-        writer.write(fname)
+        writer.write(dest)
+
+    def to_bytes(self):
+        writer = Writer(self.tree, self.meta)
+        return writer.to_bytes()
 
 
 def walk_tree(mmdb, visitor_leaf=None, visitor_node=None):
@@ -5,21 +5,46 @@ from .types import Uint16, Uint32, Uint64, Uint128, Int32, Float, Double
 import struct
 
 
+# Metadata section is at most 128 KiB long and is located at the end of the
+# database, so only that tail needs to be scanned for the magic marker.
+METADATA_MAX_SIZE = 128 * 1024
+
+
 class Reader(object):
-    def __init__(self, fname):
-        with open(fname, 'rb') as f:
-            self.db = f.read()
+    def __init__(self, source):
+        # source is either a file name or database contents in any object
+        # supporting the buffer interface (bytes, bytearray, memoryview, mmap,
+        # array, ...). Contents are used in place, without copying. With
+        # Python 2, where bytes and str are the same type, a str is treated as
+        # a file name only if it contains no NUL bytes.
+        if isinstance(source, type(u'')) or \
+                (isinstance(source, type('')) and '\x00' not in source):
+            with open(source, 'rb') as f:
+                source = f.read()
+
+        try:
+            self.db = memoryview(source)
+        except TypeError:
+            # Python 2 mmap and array only provide the old buffer interface.
+            self.db = buffer(source)
+
+        # Offsets below are in bytes, while memoryview is indexed by items.
+        if type(self.db) is memoryview and self.db.itemsize != 1:
+            raise Exception('buffer item size is {}, expected 1'.
+                            format(self.db.itemsize))
 
         self.offset = 0
         self.pointer_cache = {}
         self.leaf_cache = {}
         self.node_cache = {}
 
-        self.metadata_offset = self.db.rfind(types.METADATA_MAGIC)
+        tail_offset = max(0, len(self.db) - METADATA_MAX_SIZE)
+        tail = self._read_bytes(tail_offset, len(self.db))
+        self.metadata_offset = tail.rfind(types.METADATA_MAGIC)
         if self.metadata_offset < 0:
             raise Exception("no metadata")
 
-        self.metadata_offset += len(types.METADATA_MAGIC)
+        self.metadata_offset += tail_offset + len(types.METADATA_MAGIC)
 
         meta = self._unserialize(self.metadata_offset)
 
@@ -176,7 +201,7 @@ class Reader(object):
             return value
 
         elif field_type == types.TYPE_UTF8:
-            s = self.db[self.offset:self.offset+field_length]
+            s = self._read_bytes(self.offset, self.offset + field_length)
             self.offset += field_length
             return s.decode('utf-8')
 
@@ -186,7 +211,7 @@ class Reader(object):
             return Double(value)
 
         elif field_type == types.TYPE_BYTES:
-            s = self.db[self.offset:self.offset+field_length]
+            s = self._read_bytes(self.offset, self.offset + field_length)
             self.offset += field_length
             return s
 
@@ -236,6 +261,12 @@ class Reader(object):
         else:
             raise NotImplementedError('unknown type {}'.format(field_type))
 
+    def _read_bytes(self, start, end):
+        s = self.db[start:end]
+        if type(s) is memoryview:
+            return s.tobytes()
+        return s
+
     def _read_uint(self, length):
         n = 0
         for _ in range(length):
@@ -246,6 +277,6 @@ class Reader(object):
         return n
 
 
-def read_database(fname):
-    reader = Reader(fname)
+def read_database(source):
+    reader = Reader(source)
     return MMDB(reader.get_tree(), reader.get_meta())
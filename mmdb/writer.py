@@ -5,6 +5,11 @@ import math
 import struct
 
 
+# Output is accumulated and handed to the destination in chunks of this size,
+# so file-like objects see a few large writes instead of one per record.
+WRITE_CHUNK_SIZE = 1024 * 1024
+
+
 class Writer(object):
     def __init__(self, tree, meta):
         self.tree = tree
@@ -41,16 +46,33 @@ class Writer(object):
             self._enumerate_nodes(node.right)
 
         elif type(node) is SearchTreeLeaf:
-            if 'serialized' not in node.__dict__:
-                node.serialized = self._serialize_value(node.value, True)
-                node.data_offset = self._data_pointer
-                self._data_list.append(node.serialized)
-                self._data_pointer += len(node.serialized)
+            node_id = id(node)
+            if node_id not in self._leaf_offset:
+                serialized = self._serialize_value(node.value, True)
+                self._leaf_offset[node_id] = self._data_pointer
+                self._data_list.append(serialized)
+                self._data_pointer += len(serialized)
 
         else:  # == None
             return
 
-    def write(self, fname):
+    def write(self, dest):
+        # dest is either a file name or a writable file-like object.
+        if hasattr(dest, 'write'):
+            self._write_stream(bytearray(), dest.write)
+        else:
+            with open(dest, 'wb') as f:
+                self._write_stream(bytearray(), f.write)
+
+    def to_bytes(self):
+        buf = bytearray()
+        self._write_stream(buf)
+        return bytes(buf)
+
+    def _write_stream(self, buf, flush=None):
+        # Serialized database is appended to buf. If flush is given, it is
+        # called with a copy of buf every time buf grows over
+        # WRITE_CHUNK_SIZE, and buf is emptied afterwards.
         self._node_counter = 0
         self._node_list = []
         self._data_pointer = 16
@@ -67,49 +89,57 @@ class Writer(object):
             elif type(node) is SearchTreeNode:
                 return self._node_idx[id(node)]
             elif type(node) is SearchTreeLeaf:
-                return node.data_offset + self.meta.node_count
+                return self._leaf_offset[id(node)] + self.meta.node_count
             else:
                 raise Exception("unexpected type")
 
-        with open(fname, 'wb') as f:
-            for node in self._node_list:
-                left_idx = calc_record_idx(node.left)
-                right_idx = calc_record_idx(node.right)
-
-                if self.meta.record_size == 24:
-                    b1 = (left_idx >> 16) & 0xff
-                    b2 = (left_idx >> 8) & 0xff
-                    b3 = left_idx & 0xff
-                    b4 = (right_idx >> 16) & 0xff
-                    b5 = (right_idx >> 8) & 0xff
-                    b6 = right_idx & 0xff
-                    f.write(struct.pack('>BBBBBB', b1, b2, b3, b4, b5, b6))
-
-                elif self.meta.record_size == 28:
-                    b1 = (left_idx >> 16) & 0xff
-                    b2 = (left_idx >> 8) & 0xff
-                    b3 = left_idx & 0xff
-                    b4 = ((left_idx >> 24) & 0xf) * 16 + \
-                         ((right_idx >> 24) & 0xf)
-                    b5 = (right_idx >> 16) & 0xff
-                    b6 = (right_idx >> 8) & 0xff
-                    b7 = right_idx & 0xff
-                    f.write(struct.pack('>BBBBBBB', b1, b2, b3, b4, b5, b6,
-                                        b7))
-
-                elif self.meta.record_size == 32:
-                    f.write(struct.pack('>II', left_idx, right_idx))
-
-                else:
-                    raise Exception('self.meta.record_size > 32')
-
-            f.write(b'\x00' * 16)
-
-            for element in self._data_list:
-                f.write(element)
-
-            f.write(types.METADATA_MAGIC)
-            f.write(self._serialize_value(self.meta.get()))
+        def emit(data):
+            buf.extend(data)
+            if flush is not None and len(buf) >= WRITE_CHUNK_SIZE:
+                flush(bytes(buf))
+                del buf[:]
+
+        for node in self._node_list:
+            left_idx = calc_record_idx(node.left)
+            right_idx = calc_record_idx(node.right)
+
+            if self.meta.record_size == 24:
+                b1 = (left_idx >> 16) & 0xff
+                b2 = (left_idx >> 8) & 0xff
+                b3 = left_idx & 0xff
+                b4 = (right_idx >> 16) & 0xff
+                b5 = (right_idx >> 8) & 0xff
+                b6 = right_idx & 0xff
+                emit(struct.pack('>BBBBBB', b1, b2, b3, b4, b5, b6))
+
+            elif self.meta.record_size == 28:
+                b1 = (left_idx >> 16) & 0xff
+                b2 = (left_idx >> 8) & 0xff
+                b3 = left_idx & 0xff
+                b4 = ((left_idx >> 24) & 0xf) * 16 + \
+                     ((right_idx >> 24) & 0xf)
+                b5 = (right_idx >> 16) & 0xff
+                b6 = (right_idx >> 8) & 0xff
+                b7 = right_idx & 0xff
+                emit(struct.pack('>BBBBBBB', b1, b2, b3, b4, b5, b6, b7))
+
+            elif self.meta.record_size == 32:
+                emit(struct.pack('>II', left_idx, right_idx))
+
+            else:
+                raise Exception('self.meta.record_size > 32')
+
+        emit(b'\x00' * 16)
+
+        for element in self._data_list:
+            emit(element)
+
+        emit(types.METADATA_MAGIC)
+        emit(self._serialize_value(self.meta.get()))
+
+        if flush is not None and buf:
+            flush(bytes(buf))
+            del buf[:]
 
     def _make_value_header(self, type_, length):
         if length >= 16843036:
@@ -0,0 +1,115 @@
+import array
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+
+import mmdb
+from mmdb import SearchTreeNode, SearchTreeLeaf, Uint32
+from mmdb.mmdb import MMDB, MMDBMeta
+from mmdb.writer import Writer
+import mmdb.writer
+
+
+def make_db():
+    leaf = SearchTreeLeaf({u'name': u'x' * 100,
+                           u'id': Uint32(5),
+                           u'tags': [True, u'q']})
+    tree = SearchTreeNode(SearchTreeNode(leaf, None),
+                          SearchTreeNode(None, leaf))
+    meta = MMDBMeta()
+    meta.languages = [u'en']
+    meta.node_count = 3
+    return MMDB(tree, meta)
+
+
+class RoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmpdir, 'test.mmdb')
+        self.db = make_db()
+        self.data = self.db.to_bytes()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def check_database(self, db):
+        value = db.tree.left.left.value
+        self.assertEqual(value[u'name'], u'x' * 100)
+        self.assertEqual(value[u'id'].value, 5)
+        self.assertEqual(value[u'tags'], [True, u'q'])
+        self.assertIs(db.tree.right.right.value, value)
+        self.assertIsNone(db.tree.left.right)
+        self.assertIsNone(db.tree.right.left)
+        self.assertEqual(db.meta.node_count, 3)
+        self.assertEqual(db.meta.languages, [u'en'])
+
+    def test_write_file_matches_to_bytes(self):
+        self.db.write(self.fname)
+        with open(self.fname, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_write_fileobj_matches_to_bytes(self):
+        f = io.BytesIO()
+        self.db.write(f)
+        self.assertEqual(f.getvalue(), self.data)
+
+    def test_write_in_small_chunks(self):
+        chunk_size = mmdb.writer.WRITE_CHUNK_SIZE
+        mmdb.writer.WRITE_CHUNK_SIZE = 16
+        try:
+            f = io.BytesIO()
+            Writer(self.db.tree, self.db.meta).write(f)
+        finally:
+            mmdb.writer.WRITE_CHUNK_SIZE = chunk_size
+        self.assertEqual(f.getvalue(), self.data)
+
+    def test_write_to_sink_keeping_references(self):
+        chunk_size = mmdb.writer.WRITE_CHUNK_SIZE
+        mmdb.writer.WRITE_CHUNK_SIZE = 16
+        try:
+            chunks = []
+            sink = type('Sink', (object,), {'write': chunks.append})()
+            Writer(self.db.tree, self.db.meta).write(sink)
+        finally:
+            mmdb.writer.WRITE_CHUNK_SIZE = chunk_size
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks), self.data)
+
+    def test_to_bytes_type(self):
+        self.assertIs(type(self.data), bytes)
+
+    def test_write_twice(self):
+        self.assertEqual(self.db.to_bytes(), self.data)
+
+    def test_read_to_bytes(self):
+        self.check_database(mmdb.read_database(self.db.to_bytes()))
+
+    def test_read_truncated(self):
+        with self.assertRaisesRegexp(Exception, 'no metadata'):
+            mmdb.read_database(self.data[:40])
+
+    def test_read_file(self):
+        self.db.write(self.fname)
+        self.check_database(mmdb.read_database(self.fname))
+
+    def test_read_buffers(self):
+        sources = [bytes(self.data), bytearray(self.data),
+                   memoryview(self.data), array.array('B', self.data)]
+        for source in sources:
+            self.check_database(mmdb.read_database(source))
+
+    def test_read_mmap(self):
+        self.db.write(self.fname)
+        with open(self.fname, 'rb') as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self.check_database(mmdb.read_database(m))
+            finally:
+                m.close()
+
+
+if __name__ == '__main__':
+    unittest.main()